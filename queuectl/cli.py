@@ -3,19 +3,103 @@ Command-line interface for QueueCTL.
 """
 
 import click
-import json
+import orjson
 import sys
-from datetime import datetime
-from tabulate import tabulate
+import unicodedata
+from functools import lru_cache
+from typing import Optional, Tuple
 
-from .models import Job, JobState, Config
-from .storage import Storage
-from .manager import WorkerManager
+from .models import Job, JobState, CONFIG_REFRESH_INTERVAL
 
 
-# Create storage instance
-storage = Storage()
-manager = WorkerManager()
+# Display order of job states in status output
+_STATUS_ORDER = (JobState.PENDING, JobState.PROCESSING, JobState.COMPLETED,
+                 JobState.FAILED, JobState.DEAD)
+
+# Fields accepted in an enqueued job definition
+_JOB_INPUT_FIELDS = frozenset(('id', 'command', 'max_retries'))
+
+
+@lru_cache(maxsize=1)
+def _storage():
+    """Open the storage on first use rather than at import time."""
+    from .storage import Storage
+    return Storage()
+
+
+@lru_cache(maxsize=1)
+def _manager():
+    """Create the worker manager on first use rather than at import time."""
+    from .manager import WorkerManager
+    return WorkerManager()
+
+
+def _char_width(char: str) -> int:
+    """Terminal columns taken by one printable character."""
+    if unicodedata.category(char) in ("Mn", "Me", "Cf"):
+        # Combining marks and format characters (ZWJ, variation selectors)
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+def _cell(value, limit: Optional[int] = None) -> Tuple[str, int]:
+    """
+    Prepare a table cell for _render_table.
+    
+    The value is flattened onto one line, stripped of control characters
+    and cut to at most limit terminal columns (marked with '...').
+    Returns (text, display width) so the cell is only measured once.
+    """
+    text = " ".join(str(value).split())
+    if text.isascii() and text.isprintable():
+        if limit is not None and len(text) > limit:
+            text = text[:limit - 3] + "..."
+        return text, len(text)
+    
+    chars = [char for char in text if unicodedata.category(char) != "Cc"]
+    widths = [_char_width(char) for char in chars]
+    width = sum(widths)
+    if limit is None or width <= limit:
+        return "".join(chars), width
+    
+    kept = []
+    used = 0
+    for char, char_width in zip(chars, widths):
+        if used + char_width > limit - 3:
+            break
+        kept.append(char)
+        used += char_width
+    return "".join(kept) + "...", used + 3
+
+
+def _render_table(headers, rows, numeric=()):
+    """
+    Echo a grid table of cells prepared with _cell, one row at a time.
+    
+    Columns listed in numeric are right-aligned.
+    """
+    widths = [
+        max(len(header), *(row[index][1] for row in rows))
+        for index, header in enumerate(headers)
+    ]
+    border = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
+    
+    def format_cell(index, cell):
+        text, width = cell
+        fill = " " * (widths[index] - width)
+        return fill + text if index in numeric else text + fill
+    
+    def format_row(cells):
+        return "| " + " | ".join(
+            format_cell(index, cell) for index, cell in enumerate(cells)
+        ) + " |"
+    
+    click.echo(border)
+    click.echo(format_row([(header, len(header)) for header in headers]))
+    click.echo(border.replace("-", "="))
+    for row in rows:
+        click.echo(format_row(row))
+        click.echo(border)
 
 
 @click.group()
@@ -44,29 +128,49 @@ def enqueue(job_json):
         # Check if it's a file path
         if job_json.startswith('@'):
             file_path = job_json[1:]
-            with open(file_path, 'r') as f:
-                job_data = json.load(f)
+            with open(file_path, 'rb') as f:
+                job_data = orjson.loads(f.read())
         else:
-            job_data = json.loads(job_json)
+            job_data = orjson.loads(job_json)
+        
+        if not isinstance(job_data, dict):
+            click.echo("Error: Job definition must be a JSON object", err=True)
+            sys.exit(1)
+        
+        unknown = set(job_data) - _JOB_INPUT_FIELDS
+        if unknown:
+            click.echo(f"Error: Unknown field(s): {', '.join(sorted(unknown))}", err=True)
+            click.echo(f"Valid fields: {', '.join(sorted(_JOB_INPUT_FIELDS))}", err=True)
+            sys.exit(1)
+        
+        try:
+            job_id = job_data['id']
+            command = job_data['command']
+        except KeyError as e:
+            click.echo(f"Error: Missing required field {e}", err=True)
+            sys.exit(1)
         
-        # Get current config for max_retries default
-        config = storage.get_config()
+        max_retries = job_data.get('max_retries')
+        if max_retries is not None and (
+                not isinstance(max_retries, int) or isinstance(max_retries, bool)):
+            click.echo("Error: max_retries must be an integer", err=True)
+            sys.exit(1)
         
-        # Set defaults from config if not provided
-        if 'max_retries' not in job_data:
-            job_data['max_retries'] = config.max_retries
+        if max_retries is None:
+            # Fall back to the configured default
+            max_retries = _storage().get_config().max_retries
         
         # Create job
-        job = Job.from_dict(job_data)
+        job = Job(id=job_id, command=command, max_retries=max_retries)
         
         # Check if job already exists
-        existing_job = storage.get_job(job.id)
+        existing_job = _storage().get_job(job.id)
         if existing_job:
             click.echo(f"Error: Job with ID '{job.id}' already exists", err=True)
             sys.exit(1)
         
         # Save job
-        if storage.save_job(job):
+        if _storage().save_job(job):
             click.echo(f"✓ Job '{job.id}' enqueued successfully")
             click.echo(f"  Command: {job.command}")
             click.echo(f"  Max retries: {job.max_retries}")
@@ -74,7 +178,7 @@ def enqueue(job_json):
             click.echo("Error: Failed to enqueue job", err=True)
             sys.exit(1)
     
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         click.echo(f"Error: Invalid JSON: {e}", err=True)
         sys.exit(1)
     except Exception as e:
@@ -101,7 +205,7 @@ def worker_start(count):
         click.echo("Error: Worker count must be at least 1", err=True)
         sys.exit(1)
     
-    pids = manager.start_workers(count)
+    pids = _manager().start_workers(count)
     
     if not pids:
         sys.exit(1)
@@ -117,7 +221,7 @@ def worker_stop(force):
         queuectl worker stop
         queuectl worker stop --force
     """
-    count = manager.stop_workers(graceful=not force)
+    count = _manager().stop_workers(graceful=not force)
     
     if count == 0:
         sys.exit(1)
@@ -131,7 +235,9 @@ def worker_status():
     Example:
         queuectl worker status
     """
-    workers = manager.get_worker_status()
+    from tabulate import tabulate
+    
+    workers = _manager().get_worker_status()
     
     if not workers:
         click.echo("No workers running")
@@ -164,33 +270,33 @@ def status():
     Example:
         queuectl status
     """
+    from tabulate import tabulate
+    
     # Get job counts
-    counts = storage.get_job_counts()
+    counts, total_jobs = _storage().state_counts_and_total()
     
     # Get worker status
-    workers = manager.get_worker_status()
+    workers = _manager().get_worker_status()
     
     click.echo("\n=== QueueCTL Status ===\n")
     
     # Job statistics
     click.echo("Jobs by State:")
     table_data = []
-    for state in [JobState.PENDING, JobState.PROCESSING, JobState.COMPLETED, 
-                  JobState.FAILED, JobState.DEAD]:
-        count = counts.get(state, 0)
+    for state in _STATUS_ORDER:
+        count = counts[state]
         icon = "●" if count > 0 else "○"
         table_data.append([icon, state.upper(), count])
     
     click.echo(tabulate(table_data, headers=['', 'State', 'Count'], tablefmt='simple'))
     
-    total_jobs = sum(counts.values())
     click.echo(f"\nTotal jobs: {total_jobs}")
     
     # Worker statistics
     click.echo(f"\nActive workers: {len(workers)}")
     
     # Configuration
-    config = storage.get_config()
+    config = _storage().get_config()
     click.echo("\nConfiguration:")
     click.echo(f"  Max retries: {config.max_retries}")
     click.echo(f"  Backoff base: {config.backoff_base}")
@@ -200,7 +306,8 @@ def status():
 
 @cli.command('list')
 @click.option('--state', '-s', type=str, help='Filter by job state')
-@click.option('--limit', '-l', type=int, default=50, help='Maximum number of jobs to show')
+@click.option('--limit', '-l', type=click.IntRange(min=1), default=50,
+              help='Maximum number of jobs to show')
 def list_jobs(state, limit):
     """
     List jobs, optionally filtered by state.
@@ -212,52 +319,34 @@ def list_jobs(state, limit):
     """
     if state:
         state = state.lower()
-        if state not in [JobState.PENDING, JobState.PROCESSING, JobState.COMPLETED,
-                        JobState.FAILED, JobState.DEAD]:
+        if state not in JobState.ALL:
             click.echo(f"Error: Invalid state '{state}'", err=True)
             click.echo(f"Valid states: pending, processing, completed, failed, dead", err=True)
             sys.exit(1)
         
-        jobs = storage.get_jobs_by_state(state)
+        jobs = _storage().get_jobs_by_state(state, limit=limit)
     else:
-        jobs = storage.get_all_jobs()
+        jobs = _storage().get_all_jobs(limit=limit)
     
     if not jobs:
         click.echo("No jobs found")
         return
     
-    # Limit results
-    jobs = jobs[:limit]
-    
-    # Format job data
-    table_data = []
-    for job in jobs:
-        # Truncate command if too long
-        command = job.command
-        if len(command) > 40:
-            command = command[:37] + "..."
-        
-        # Format error message
-        error = ""
-        if job.error_message:
-            error = job.error_message
-            if len(error) > 30:
-                error = error[:27] + "..."
-        
-        table_data.append([
-            job.id,
-            command,
-            job.state,
-            f"{job.attempts}/{job.max_retries}",
-            error,
-            job.created_at[:19]
-        ])
+    headers = ['ID', 'Command', 'State', 'Attempts', 'Error', 'Created']
+    rows = [
+        (
+            _cell(job.id),
+            _cell(job.command, 40),
+            _cell(job.state),
+            _cell(f"{job.attempts}/{job.max_retries}"),
+            _cell(job.error_message or "", 30),
+            _cell(job.created_at[:19])
+        )
+        for job in jobs
+    ]
     
-    click.echo("\n" + tabulate(
-        table_data,
-        headers=['ID', 'Command', 'State', 'Attempts', 'Error', 'Created'],
-        tablefmt='grid'
-    ))
+    click.echo()
+    _render_table(headers, rows)
     
     click.echo(f"\nShowing {len(jobs)} job(s)")
     if len(jobs) == limit:
@@ -273,7 +362,7 @@ def get_job(job_id):
     Example:
         queuectl get job1
     """
-    job = storage.get_job(job_id)
+    job = _storage().get_job(job_id)
     
     if not job:
         click.echo(f"Error: Job '{job_id}' not found", err=True)
@@ -289,47 +378,41 @@ def dlq():
 
 
 @dlq.command('list')
-def dlq_list():
+@click.option('--limit', '-l', type=click.IntRange(min=1), default=50,
+              help='Maximum number of jobs to show')
+def dlq_list(limit):
     """
-    List all jobs in the Dead Letter Queue.
+    List jobs in the Dead Letter Queue.
     
     Example:
         queuectl dlq list
+        queuectl dlq list --limit 10
     """
-    jobs = storage.get_jobs_by_state(JobState.DEAD)
+    jobs = _storage().get_jobs_by_state(JobState.DEAD, limit=limit)
     
     if not jobs:
         click.echo("No jobs in DLQ")
         return
     
-    # Format job data
-    table_data = []
-    for job in jobs:
-        # Truncate command if too long
-        command = job.command
-        if len(command) > 40:
-            command = command[:37] + "..."
-        
-        # Truncate error
-        error = job.error_message or ""
-        if len(error) > 40:
-            error = error[:37] + "..."
-        
-        table_data.append([
-            job.id,
-            command,
-            job.attempts,
-            error,
-            job.updated_at[:19]
-        ])
+    headers = ['ID', 'Command', 'Attempts', 'Last Error', 'Failed At']
+    rows = [
+        (
+            _cell(job.id),
+            _cell(job.command, 40),
+            _cell(job.attempts),
+            _cell(job.error_message or "", 40),
+            _cell(job.updated_at[:19])
+        )
+        for job in jobs
+    ]
     
-    click.echo("\n" + tabulate(
-        table_data,
-        headers=['ID', 'Command', 'Attempts', 'Last Error', 'Failed At'],
-        tablefmt='grid'
-    ))
+    click.echo()
+    _render_table(headers, rows, numeric=(2,))
     
-    click.echo(f"\nTotal jobs in DLQ: {len(jobs)}")
+    total = _storage().count_by_state(JobState.DEAD)
+    click.echo(f"\nTotal jobs in DLQ: {total}")
+    if total > len(jobs):
+        click.echo(f"(Showing {len(jobs)}. Use --limit to show more)")
 
 
 @dlq.command('retry')
@@ -343,7 +426,7 @@ def dlq_retry(job_id, reset_attempts):
         queuectl dlq retry job1
         queuectl dlq retry job1 --reset-attempts
     """
-    job = storage.get_job(job_id)
+    job = _storage().get_job(job_id)
     
     if not job:
         click.echo(f"Error: Job '{job_id}' not found", err=True)
@@ -361,7 +444,7 @@ def dlq_retry(job_id, reset_attempts):
     if reset_attempts:
         job.attempts = 0
     
-    if storage.save_job(job):
+    if _storage().save_job(job):
         click.echo(f"✓ Job '{job_id}' moved back to pending queue")
         if reset_attempts:
             click.echo(f"  Attempts reset to 0")
@@ -379,16 +462,12 @@ def dlq_clear():
     Example:
         queuectl dlq clear
     """
-    jobs = storage.get_jobs_by_state(JobState.DEAD)
-    count = len(jobs)
+    count = _storage().delete_jobs_by_state(JobState.DEAD)
     
     if count == 0:
         click.echo("No jobs in DLQ")
         return
     
-    for job in jobs:
-        storage.delete_job(job.id)
-    
     click.echo(f"✓ Deleted {count} job(s) from DLQ")
 
 
@@ -406,7 +485,9 @@ def config_show():
     Example:
         queuectl config show
     """
-    cfg = storage.get_config()
+    from tabulate import tabulate
+    
+    cfg = _storage().get_config()
     
     click.echo("\n=== Configuration ===\n")
     table_data = [
@@ -445,27 +526,26 @@ def config_set(key, value):
         sys.exit(1)
     
     # Get current config
-    cfg = storage.get_config()
-    cfg_dict = cfg.to_dict()
+    cfg = _storage().get_config()
     
     # Update value
     internal_key = key_map[key]
     try:
-        # Convert value to appropriate type
-        current_value = cfg_dict[internal_key]
-        if isinstance(current_value, int):
-            cfg_dict[internal_key] = int(value)
-        elif isinstance(current_value, float):
-            cfg_dict[internal_key] = float(value)
-        else:
-            cfg_dict[internal_key] = value
+        # Convert value to the type of the current setting
+        typed_value = type(getattr(cfg, internal_key))(value)
+        setattr(cfg, internal_key, typed_value)
         
         # Save config
-        new_cfg = Config.from_dict(cfg_dict)
-        storage.save_config(new_cfg)
+        _storage().save_config(cfg)
         
-        click.echo(f"✓ Configuration updated: {key} = {cfg_dict[internal_key]}")
-        click.echo(f"  Note: Restart workers for changes to take effect")
+        click.echo(f"✓ Configuration updated: {key} = {typed_value}")
+        if internal_key == 'max_retries':
+            # Each job keeps the max_retries it was enqueued with
+            click.echo("  Note: Applies to jobs enqueued from now on; "
+                       "existing jobs keep their current limit")
+        else:
+            click.echo(f"  Note: Running workers pick up changes within "
+                       f"{CONFIG_REFRESH_INTERVAL}s")
     
     except ValueError:
         click.echo(f"Error: Invalid value '{value}' for {key}", err=True)
@@ -484,24 +564,18 @@ def clear_jobs(state):
     """
     if state:
         state = state.lower()
-        if state not in [JobState.PENDING, JobState.PROCESSING, JobState.COMPLETED,
-                        JobState.FAILED, JobState.DEAD]:
+        if state not in JobState.ALL:
             click.echo(f"Error: Invalid state '{state}'", err=True)
             sys.exit(1)
         
-        jobs = storage.get_jobs_by_state(state)
+        count = _storage().delete_jobs_by_state(state)
     else:
-        jobs = storage.get_all_jobs()
-    
-    count = len(jobs)
+        count = _storage().delete_all_jobs()
     
     if count == 0:
         click.echo("No jobs to clear")
         return
     
-    for job in jobs:
-        storage.delete_job(job.id)
-    
     click.echo(f"✓ Deleted {count} job(s)")
 
 
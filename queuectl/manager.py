@@ -173,8 +173,13 @@ class WorkerManager:
     
     def _is_process_running(self, pid: int) -> bool:
         """Check if a process is running."""
-        try:
-            process = psutil.Process(pid)
-            return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            return False
+        return is_process_running(pid)
+
+
+def is_process_running(pid: int) -> bool:
+    """Check if a process is running (zombies count as dead)."""
+    try:
+        process = psutil.Process(pid)
+        return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
@@ -2,10 +2,37 @@
 Data models for QueueCTL job queue system.
 """
 
-from dataclasses import dataclass, asdict
-from datetime import datetime
+from dataclasses import dataclass
 from typing import Optional
-import json
+import time
+import orjson
+
+
+def _dumps(obj) -> str:
+    """Serialize an object to an indented JSON string."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+
+_loads = orjson.loads
+
+# (epoch second, formatted "YYYY-MM-DDTHH:MM:SS") of the last timestamp
+_utc_second_cache = (None, "")
+
+
+def utcnow_iso(offset: float = 0) -> str:
+    """
+    Return the current UTC time, shifted by offset seconds, as an ISO 8601
+    string with a 'Z' suffix and always six fractional digits.
+    
+    The date/time prefix is reformatted only when the second changes.
+    """
+    global _utc_second_cache
+    seconds, micros = divmod(time.time_ns() // 1000 + int(offset * 1_000_000), 1_000_000)
+    cached_second, prefix = _utc_second_cache
+    if seconds != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _utc_second_cache = (seconds, prefix)
+    return f"{prefix}.{micros:06d}Z"
 
 
 class JobState:
@@ -15,6 +42,8 @@ class JobState:
     COMPLETED = "completed"
     FAILED = "failed"
     DEAD = "dead"
+    
+    ALL = frozenset((PENDING, PROCESSING, COMPLETED, FAILED, DEAD))
 
 
 @dataclass
@@ -32,19 +61,30 @@ class Job:
     
     def __post_init__(self):
         """Initialize timestamps if not provided."""
-        now = datetime.utcnow().isoformat() + "Z"
-        if self.created_at is None:
-            self.created_at = now
-        if self.updated_at is None:
-            self.updated_at = now
+        if self.created_at is None or self.updated_at is None:
+            now = utcnow_iso()
+            if self.created_at is None:
+                self.created_at = now
+            if self.updated_at is None:
+                self.updated_at = now
     
     def to_dict(self) -> dict:
         """Convert job to dictionary."""
-        return asdict(self)
+        return {
+            "id": self.id,
+            "command": self.command,
+            "state": self.state,
+            "attempts": self.attempts,
+            "max_retries": self.max_retries,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "next_retry_at": self.next_retry_at,
+            "error_message": self.error_message,
+        }
     
     def to_json(self) -> str:
         """Convert job to JSON string."""
-        return json.dumps(self.to_dict(), indent=2)
+        return _dumps(self.to_dict())
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Job':
@@ -54,8 +94,11 @@ class Job:
     @classmethod
     def from_json(cls, json_str: str) -> 'Job':
         """Create job from JSON string."""
-        data = json.loads(json_str)
-        return cls.from_dict(data)
+        return cls.from_dict(_loads(json_str))
+
+
+# Seconds between a worker's config reloads from storage
+CONFIG_REFRESH_INTERVAL = 30
 
 
 @dataclass
@@ -68,7 +111,12 @@ class Config:
     
     def to_dict(self) -> dict:
         """Convert config to dictionary."""
-        return asdict(self)
+        return {
+            "max_retries": self.max_retries,
+            "backoff_base": self.backoff_base,
+            "worker_poll_interval": self.worker_poll_interval,
+            "job_timeout": self.job_timeout,
+        }
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Config':
@@ -3,13 +3,12 @@ Persistent storage layer using SQLite for job queue system.
 """
 
 import sqlite3
-import json
+import orjson
 import threading
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from contextlib import contextmanager
-from datetime import datetime
 
-from .models import Job, JobState, Config
+from .models import Job, JobState, Config, utcnow_iso
 
 
 class Storage:
@@ -85,7 +84,7 @@ class Storage:
     def save_job(self, job: Job) -> bool:
         """Save or update a job."""
         try:
-            job.updated_at = datetime.utcnow().isoformat() + "Z"
+            job.updated_at = utcnow_iso()
             
             with self._get_cursor() as cursor:
                 cursor.execute("""
@@ -118,27 +117,31 @@ class Storage:
                 return Job(**dict(row))
             return None
     
-    def get_jobs_by_state(self, state: str) -> List[Job]:
-        """Get all jobs in a specific state."""
+    def get_jobs_by_state(self, state: str, limit: Optional[int] = None,
+                          offset: int = 0) -> List[Job]:
+        """Get jobs in a specific state, optionally a single page of them."""
         with self._get_cursor() as cursor:
+            # SQLite treats a negative LIMIT as "no limit"
             cursor.execute("""
                 SELECT id, command, state, attempts, max_retries,
                        created_at, updated_at, next_retry_at, error_message
                 FROM jobs WHERE state = ?
                 ORDER BY created_at ASC
-            """, (state,))
+                LIMIT ? OFFSET ?
+            """, (state, -1 if limit is None else limit, offset))
             
             return [Job(**dict(row)) for row in cursor.fetchall()]
     
-    def get_all_jobs(self) -> List[Job]:
-        """Get all jobs."""
+    def get_all_jobs(self, limit: Optional[int] = None, offset: int = 0) -> List[Job]:
+        """Get all jobs, optionally a single page of them."""
         with self._get_cursor() as cursor:
             cursor.execute("""
                 SELECT id, command, state, attempts, max_retries,
                        created_at, updated_at, next_retry_at, error_message
                 FROM jobs
                 ORDER BY created_at DESC
-            """)
+                LIMIT ? OFFSET ?
+            """, (-1 if limit is None else limit, offset))
             
             return [Job(**dict(row)) for row in cursor.fetchall()]
     
@@ -147,7 +150,7 @@ class Storage:
         Atomically acquire a pending job for processing.
         Returns the job if successfully acquired, None otherwise.
         """
-        now = datetime.utcnow().isoformat() + "Z"
+        now = utcnow_iso()
         
         with self._get_cursor() as cursor:
             # Start transaction
@@ -160,7 +163,8 @@ class Storage:
                            created_at, updated_at, next_retry_at, error_message
                     FROM jobs
                     WHERE (state = ? OR (state = ? AND next_retry_at <= ?))
-                      AND (locked_by IS NULL OR locked_at < datetime('now', '-5 minutes'))
+                      AND (locked_by IS NULL
+                           OR locked_at < strftime('%Y-%m-%dT%H:%M:%fZ', 'now', '-5 minutes'))
                     ORDER BY created_at ASC
                     LIMIT 1
                 """, (JobState.PENDING, JobState.FAILED, now))
@@ -199,24 +203,82 @@ class Storage:
                 WHERE id = ?
             """, (job_id,))
     
-    def get_job_counts(self) -> Dict[str, int]:
-        """Get count of jobs by state."""
+    def get_processing_locks(self) -> Dict[str, Optional[str]]:
+        """Get the lock holder of every job in the processing state."""
         with self._get_cursor() as cursor:
+            cursor.execute("""
+                SELECT id, locked_by
+                FROM jobs WHERE state = ?
+            """, (JobState.PROCESSING,))
+            
+            return {row['id']: row['locked_by'] for row in cursor.fetchall()}
+    
+    def recover_orphaned_job(self, job_id: str, locked_by: Optional[str],
+                             error_message: str) -> Optional[str]:
+        """
+        Take a processing job back from a worker that died while running it.
+        
+        The interrupted run counts as an attempt: the job goes back to
+        pending, or to dead once max_retries is reached. Only applies if
+        the job is still held by `locked_by`, so a job re-acquired in the
+        meantime is left alone.
+        Returns the job's new state, or None if it was not recovered.
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute("BEGIN EXCLUSIVE")
+            
+            try:
+                cursor.execute("""
+                    UPDATE jobs
+                    SET attempts = attempts + 1,
+                        state = CASE WHEN attempts + 1 >= max_retries
+                                     THEN ? ELSE ? END,
+                        next_retry_at = NULL, error_message = ?,
+                        locked_by = NULL, locked_at = NULL, updated_at = ?
+                    WHERE id = ? AND state = ? AND locked_by IS ?
+                """, (JobState.DEAD, JobState.PENDING, error_message, utcnow_iso(),
+                      job_id, JobState.PROCESSING, locked_by))
+                
+                state = None
+                if cursor.rowcount == 1:
+                    cursor.execute("SELECT state FROM jobs WHERE id = ?", (job_id,))
+                    state = cursor.fetchone()['state']
+                
+                cursor.execute("COMMIT")
+                return state
+            
+            except Exception as e:
+                cursor.execute("ROLLBACK")
+                print(f"Error recovering job: {e}")
+                return None
+    
+    def state_counts_and_total(self) -> Tuple[Dict[str, int], int]:
+        """Get count of jobs by state plus the overall total in one query."""
+        with self._get_cursor() as cursor:
+            # The total comes back as a final row with a NULL state
             cursor.execute("""
                 SELECT state, COUNT(*) as count
                 FROM jobs
                 GROUP BY state
+                UNION ALL
+                SELECT NULL, COUNT(*) FROM jobs
             """)
             
-            counts = {row['state']: row['count'] for row in cursor.fetchall()}
-            
-            # Ensure all states are present
-            for state in [JobState.PENDING, JobState.PROCESSING, 
-                         JobState.COMPLETED, JobState.FAILED, JobState.DEAD]:
-                if state not in counts:
-                    counts[state] = 0
+            counts = dict.fromkeys(JobState.ALL, 0)
+            total = 0
+            for row in cursor.fetchall():
+                if row['state'] is None:
+                    total = row['count']
+                else:
+                    counts[row['state']] = row['count']
             
-            return counts
+            return counts, total
+    
+    def count_by_state(self, state: str) -> int:
+        """Get count of jobs in a specific state."""
+        with self._get_cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM jobs WHERE state = ?", (state,))
+            return cursor.fetchone()[0]
     
     def delete_job(self, job_id: str) -> bool:
         """Delete a job."""
@@ -228,6 +290,26 @@ class Storage:
             print(f"Error deleting job: {e}")
             return False
     
+    def delete_jobs_by_state(self, state: str) -> int:
+        """Delete all jobs in a specific state. Returns the number deleted."""
+        try:
+            with self._get_cursor() as cursor:
+                cursor.execute("DELETE FROM jobs WHERE state = ?", (state,))
+                return cursor.rowcount
+        except Exception as e:
+            print(f"Error deleting jobs: {e}")
+            return 0
+    
+    def delete_all_jobs(self) -> int:
+        """Delete all jobs. Returns the number deleted."""
+        try:
+            with self._get_cursor() as cursor:
+                cursor.execute("DELETE FROM jobs")
+                return cursor.rowcount
+        except Exception as e:
+            print(f"Error deleting jobs: {e}")
+            return 0
+    
     def save_config(self, config: Config):
         """Save configuration."""
         with self._get_cursor() as cursor:
@@ -235,7 +317,7 @@ class Storage:
                 cursor.execute("""
                     INSERT OR REPLACE INTO config (key, value)
                     VALUES (?, ?)
-                """, (key, json.dumps(value)))
+                """, (key, orjson.dumps(value).decode()))
     
     def get_config(self) -> Config:
         """Load configuration."""
@@ -249,7 +331,7 @@ class Storage:
                 self.save_config(config)
                 return config
             
-            config_dict = {row['key']: json.loads(row['value']) for row in rows}
+            config_dict = {row['key']: orjson.loads(row['value']) for row in rows}
             return Config.from_dict(config_dict)
     
     def close(self):
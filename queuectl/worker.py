@@ -3,27 +3,50 @@ Worker process implementation for job execution.
 """
 
 import os
+import selectors
 import signal
 import subprocess
 import time
 import sys
-from datetime import datetime, timedelta
-from typing import Optional
+from collections import deque
+from typing import Optional, Tuple
 
-from .models import Job, JobState, Config
+from .models import Job, JobState, Config, CONFIG_REFRESH_INTERVAL, utcnow_iso
 from .storage import Storage
+from .manager import is_process_running
 
 
 class Worker:
     """Worker process that executes jobs from the queue."""
     
+    # Most recent output lines kept per stream of a running job
+    OUTPUT_TAIL_LINES = 64
+    
+    # Longest line (in bytes) kept from job output; the rest is dropped
+    OUTPUT_MAX_LINE = 4096
+    
+    # Upper bound on the retry delay, in seconds
+    MAX_BACKOFF_SECONDS = 3600
+    
+    # Attempts covered by the precomputed backoff table; later attempts
+    # reuse the last entry, which is already capped at MAX_BACKOFF_SECONDS
+    BACKOFF_TABLE_SIZE = 64
+    
+    # Seconds between scans for jobs left behind by dead workers
+    ORPHAN_CHECK_INTERVAL = 30
+    
     def __init__(self, worker_id: str, db_path: str = "queuectl.db"):
         """Initialize worker."""
         self.worker_id = worker_id
+        # Locks carry the PID so other workers can tell if the holder died
+        self.lock_owner = f"{worker_id}:{os.getpid()}"
         self.storage = Storage(db_path)
         self.config = self.storage.get_config()
+        self._config_checked_at = time.monotonic()
+        self._backoff_table = self._build_backoff_table(self.config.backoff_base)
         self.running = False
         self.current_job: Optional[Job] = None
+        self._orphans_checked_at: Optional[float] = None
         
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGTERM, self._handle_shutdown)
@@ -42,10 +65,13 @@ class Worker:
         try:
             while self.running:
                 # Reload config periodically
-                self.config = self.storage.get_config()
+                self._refresh_config()
+                
+                # Take back jobs whose worker died mid-run
+                self._recover_orphaned_jobs()
                 
                 # Try to acquire a job
-                job = self.storage.acquire_job(self.worker_id)
+                job = self.storage.acquire_job(self.lock_owner)
                 
                 if job:
                     self.current_job = job
@@ -65,6 +91,53 @@ class Worker:
             self.storage.close()
             print(f"[Worker {self.worker_id}] Stopped")
     
+    def _refresh_config(self):
+        """Reload config from storage once the cached copy has gone stale."""
+        now = time.monotonic()
+        if now - self._config_checked_at > CONFIG_REFRESH_INTERVAL:
+            old_base = self.config.backoff_base
+            self.config = self.storage.get_config()
+            self._config_checked_at = now
+            if self.config.backoff_base != old_base:
+                self._backoff_table = self._build_backoff_table(self.config.backoff_base)
+    
+    def _recover_orphaned_jobs(self):
+        """
+        Recover processing jobs that no live worker will ever finish.
+        
+        A processing job is orphaned when the PID in its lock is no longer
+        running, or when it has no lock holder at all. The latter is by
+        design: a live worker keeps its lock until it saves the job's final
+        state, so an unlocked processing row was released without being
+        finished (the worker loop crashed). Locks without a PID, written
+        before this format was introduced, are left alone.
+        """
+        now = time.monotonic()
+        if (self._orphans_checked_at is not None
+                and now - self._orphans_checked_at <= self.ORPHAN_CHECK_INTERVAL):
+            return
+        self._orphans_checked_at = now
+        
+        for job_id, owner in self.storage.get_processing_locks().items():
+            if owner is not None:
+                _, sep, pid = owner.rpartition(":")
+                if not sep or not pid.isdigit() or is_process_running(int(pid)):
+                    continue
+            
+            state = self.storage.recover_orphaned_job(
+                job_id, owner, f"Worker {owner or '(unknown)'} died while running the job"
+            )
+            if state:
+                print(f"[Worker {self.worker_id}] Recovered orphaned job {job_id} "
+                      f"(lock holder: {owner or 'none'}), now {state}")
+    
+    def _build_backoff_table(self, base: int) -> Tuple[int, ...]:
+        """Precompute capped retry delays, indexed by attempt number."""
+        return tuple(
+            min(base ** attempt, self.MAX_BACKOFF_SECONDS)
+            for attempt in range(self.BACKOFF_TABLE_SIZE)
+        )
+    
     def _execute_job(self, job: Job):
         """Execute a job."""
         print(f"[Worker {self.worker_id}] Executing job {job.id}: {job.command}")
@@ -74,28 +147,24 @@ class Worker:
         
         try:
             # Execute the command
-            result = subprocess.run(
-                job.command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=self.config.job_timeout
+            returncode, stdout, stderr = self._run_command(
+                job.command, self.config.job_timeout
             )
             
             execution_time = time.time() - start_time
             
-            if result.returncode == 0:
+            if returncode == 0:
                 # Success
                 job.state = JobState.COMPLETED
                 job.error_message = None
                 print(f"[Worker {self.worker_id}] Job {job.id} completed successfully "
                       f"in {execution_time:.2f}s")
                 
-                if result.stdout:
-                    print(f"[Worker {self.worker_id}] Output: {result.stdout.strip()}")
+                if stdout:
+                    print(f"[Worker {self.worker_id}] Output: {stdout}")
             else:
                 # Failed
-                error_msg = result.stderr.strip() if result.stderr else f"Exit code: {result.returncode}"
+                error_msg = stderr if stderr else f"Exit code: {returncode}"
                 self._handle_job_failure(job, error_msg)
         
         except subprocess.TimeoutExpired:
@@ -111,6 +180,68 @@ class Worker:
             self.storage.save_job(job)
             self.storage.release_job(job.id)
     
+    def _run_command(self, command: str, timeout: float) -> Tuple[int, str, str]:
+        """
+        Run a shell command, streaming its output instead of buffering it.
+        
+        Only the last OUTPUT_TAIL_LINES lines of stdout and stderr are kept,
+        so memory stays flat however much the command prints.
+        Returns (returncode, stdout tail, stderr tail).
+        Raises subprocess.TimeoutExpired if the command outlives timeout.
+        """
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        tails = {
+            process.stdout: deque(maxlen=self.OUTPUT_TAIL_LINES),
+            process.stderr: deque(maxlen=self.OUTPUT_TAIL_LINES),
+        }
+        partial = {process.stdout: b"", process.stderr: b""}
+        deadline = time.monotonic() + timeout
+        
+        try:
+            with selectors.DefaultSelector() as selector:
+                for pipe in tails:
+                    selector.register(pipe, selectors.EVENT_READ)
+                
+                while selector.get_map():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise subprocess.TimeoutExpired(command, timeout)
+                    
+                    for key, _ in selector.select(remaining):
+                        pipe = key.fileobj
+                        chunk = os.read(key.fd, 65536)
+                        if not chunk:
+                            # EOF: flush any unterminated last line
+                            if partial[pipe]:
+                                tails[pipe].append(partial[pipe])
+                            selector.unregister(pipe)
+                            continue
+                        
+                        *lines, rest = (partial[pipe] + chunk).split(b"\n")
+                        tails[pipe].extend(line[:self.OUTPUT_MAX_LINE] for line in lines)
+                        partial[pipe] = rest[:self.OUTPUT_MAX_LINE]
+            
+            returncode = process.wait(timeout=max(deadline - time.monotonic(), 0))
+        
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+        
+        def decode(lines):
+            return b"\n".join(lines).decode(errors="replace").strip()
+        
+        return returncode, decode(tails[process.stdout]), decode(tails[process.stderr])
+    
     def _handle_job_failure(self, job: Job, error_message: str):
         """Handle job failure with retry logic."""
         job.error_message = error_message
@@ -125,9 +256,9 @@ class Worker:
         else:
             # Schedule retry with exponential backoff
             job.state = JobState.FAILED
-            backoff_seconds = self.config.backoff_base ** job.attempts
-            next_retry = datetime.utcnow() + timedelta(seconds=backoff_seconds)
-            job.next_retry_at = next_retry.isoformat() + "Z"
+            attempt = min(job.attempts, self.BACKOFF_TABLE_SIZE - 1)
+            backoff_seconds = self._backoff_table[attempt]
+            job.next_retry_at = utcnow_iso(backoff_seconds)
             
             print(f"[Worker {self.worker_id}] Job {job.id} failed "
                   f"(attempt {job.attempts}/{job.max_retries}), "
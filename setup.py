@@ -31,6 +31,7 @@ setup(
         "python-dateutil>=2.8.0",
         "tabulate>=0.9.0",
         "psutil>=5.9.0",
+        "orjson>=3.9.0",
     ],
     entry_points={
         "console_scripts": [